@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for the 99 CENTS Car Stereo Player tooling
+Times page fetching, page parsing and library scanning against generated
+fixtures and compares every run with a stored baseline.
+"""
+
+import argparse
+import contextlib
+import cProfile
+import io
+import json
+import os
+import platform
+import pstats
+import re
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+BENCH_DIR = os.path.join(ROOT, ".bench")
+HISTORY_FILE = "history.json"
+BASELINE_FILE = "baseline.json"
+
+# MPEG-1 Layer III, 128 kbps, 44.1 kHz, no padding: 417 byte frames
+MP3_FRAME_HEADER = b"\xff\xfb\x90\x64"
+MP3_FRAME_SIZE = 417
+ID3_HEADER = b"ID3\x03\x00\x00\x00\x00\x00\x00"
+
+
+# Fixtures
+
+def mp3_stub(frames=4):
+    """A tiny but structurally valid MP3: empty ID3v2 tag + silent frames"""
+    frame = MP3_FRAME_HEADER + b"\x00" * (MP3_FRAME_SIZE - len(MP3_FRAME_HEADER))
+    return ID3_HEADER + frame * frames
+
+
+def generate_fixtures(path, tracks=5000, force=False):
+    """Build an index.html with `tracks` entries and matching audio/ stubs"""
+    marker = os.path.join(path, ".tracks")
+    if not force and os.path.exists(marker):
+        with open(marker) as f:
+            if f.read().strip() == str(tracks):
+                return path
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(os.path.join(path, "audio"))
+    os.makedirs(os.path.join(path, "assets"))
+
+    for asset in ("sw.js", os.path.join("assets", "alpine_faceplate.png")):
+        shutil.copy(os.path.join(ROOT, asset), os.path.join(path, asset))
+
+    stub = mp3_stub()
+    entries = []
+    for i in range(1, tracks + 1):
+        with open(os.path.join(path, "audio", f"track{i}.mp3"), "wb") as f:
+            f.write(stub)
+        entries.append(
+            "      { \n"
+            f"        url: \"./audio/track{i}.mp3\", \n"
+            f"        title: \"♪ BENCH ARTIST - Fixture Track {i} ♪\",\n"
+            "        artist: \"99 CENTS\"\n"
+            "      },"
+        )
+
+    with open(os.path.join(ROOT, "index.html"), encoding="utf-8") as f:
+        page = f.read()
+    page = re.sub(r"const tracks = \[.*?\];",
+                  lambda _: "const tracks = [\n" + "\n".join(entries) + "\n    ];",
+                  page, count=1, flags=re.DOTALL)
+    with open(os.path.join(path, "index.html"), "w", encoding="utf-8") as f:
+        f.write(page)
+
+    with open(marker, "w") as f:
+        f.write(str(tracks))
+    return path
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextlib.contextmanager
+def serve(directory, timeout=10):
+    """Serve directory with `python -m http.server` in a separate process
+
+    Keeping the server out of this process means fetch timings and profiles
+    only cover the client side, not server work competing for the GIL.
+    """
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "http.server", str(port),
+         "--bind", "127.0.0.1", "--directory", directory],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+                break
+            except OSError:
+                if server.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError(f"Fixture server failed to start on port {port}")
+                time.sleep(0.05)
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        server.terminate()
+        server.wait()
+
+
+# Benchmarks
+
+def silenced(func):
+    """The testers print progress lines; keep them out of the timings output"""
+    def wrapper():
+        with contextlib.redirect_stdout(io.StringIO()):
+            return func()
+    return wrapper
+
+
+def build_benchmarks(fixtures, base_url):
+    """Return {name: callable}; benchmarks whose imports fail are skipped"""
+    benchmarks = {}
+
+    try:
+        from backend_test import CarStereoTester
+        from frontend_test import FrontendTester
+    except ImportError as e:
+        print(f"⚠️ Skipping fetch/parse benchmarks: {e}")
+    else:
+        backend = CarStereoTester(base_url)
+        frontend = FrontendTester(base_url)
+        frontend.load_page()
+
+        benchmarks["fetch_page"] = silenced(frontend.load_page)
+        # Fixed-size probe: the tester always checks the same 4 assets
+        benchmarks["fetch_assets"] = silenced(backend.test_assets_load)
+        parse_checks = [
+            frontend.test_visual_design_elements,
+            frontend.test_interactive_controls,
+            frontend.test_display_features,
+            frontend.test_keyboard_shortcuts,
+            frontend.test_debug_mode,
+            frontend.test_audio_functionality,
+            frontend.test_error_handling,
+        ]
+        benchmarks["parse_page"] = silenced(lambda: [check() for check in parse_checks])
+
+    from comprehensive_test_report import build_snapshot, referenced_assets, scan_tree
+
+    previous, _ = build_snapshot(fixtures, {})
+    benchmarks["scan_tree"] = lambda: scan_tree(fixtures)
+    benchmarks["parse_asset_refs"] = lambda: referenced_assets(fixtures)
+    benchmarks["report_cold"] = lambda: build_snapshot(fixtures, {})
+    benchmarks["report_warm"] = lambda: build_snapshot(fixtures, previous)
+    return benchmarks
+
+
+def measure(func, repeat, warmup):
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def summarize(samples):
+    return {
+        "samples": samples,
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "mean": statistics.mean(samples),
+        "stdev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+    }
+
+
+# Comparison
+
+def welch_t(a, b):
+    """Welch's t statistic for two independent samples (b slower => t > 0)"""
+    if len(a) < 2 or len(b) < 2:
+        return 0.0
+    var_a = statistics.variance(a) / len(a)
+    var_b = statistics.variance(b) / len(b)
+    if var_a + var_b == 0:
+        return float("inf") if statistics.mean(b) > statistics.mean(a) else 0.0
+    return (statistics.mean(b) - statistics.mean(a)) / (var_a + var_b) ** 0.5
+
+
+def compare(baseline, current, threshold, t_critical):
+    """Flag benchmarks that are both meaningfully and significantly slower"""
+    verdicts = {}
+    for name, result in current.items():
+        base = baseline.get(name)
+        if not base:
+            verdicts[name] = {"status": "new"}
+            continue
+        change = result["median"] / base["median"] - 1 if base["median"] else 0.0
+        t = welch_t(base["samples"], result["samples"])
+        if change > threshold and t > t_critical:
+            status = "regression"
+        elif change < -threshold and t < -t_critical:
+            status = "improvement"
+        else:
+            status = "unchanged"
+        verdicts[name] = {"status": status, "change": change, "t": t}
+    return verdicts
+
+
+# Profiling
+
+def profile(name, func, out_dir, top=15):
+    """Dump cProfile and tracemalloc hot spots for one benchmark"""
+    os.makedirs(out_dir, exist_ok=True)
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    func()
+    profiler.disable()
+    prof_path = os.path.join(out_dir, f"{name}.prof")
+    profiler.dump_stats(prof_path)
+
+    print(f"\n🔥 CPU hot spots: {name} (full profile: {prof_path})")
+    pstats.Stats(profiler, stream=sys.stdout).sort_stats("cumulative").print_stats(top)
+
+    tracemalloc.start()
+    result = func()  # keep the result alive so its allocations are in the snapshot
+    snapshot = tracemalloc.take_snapshot()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    print(f"🧠 Allocation hot spots: {name} "
+          f"(retained {current / 1024:.1f} KiB, peak {peak / 1024:.1f} KiB)")
+    for stat in snapshot.statistics("lineno")[:top]:
+        print(f"   {stat}")
+
+
+# Storage
+
+def environment(tracks):
+    """What a baseline is only comparable within"""
+    return {
+        "python": f"{platform.python_implementation()} {platform.python_version()}",
+        "machine": platform.machine(),
+        "host": platform.node(),
+        "tracks": tracks,
+    }
+
+
+def merge_baseline(stored, results, verdicts, env, save_all=False):
+    """Return the baseline to write, or None when nothing changes
+
+    Entries are merged per benchmark so --only runs never drop the others.
+    Benchmarks without a baseline yet are always recorded; save_all
+    (--save-baseline) overwrites every benchmark that ran. A baseline from
+    another environment is only replaced with save_all.
+    """
+    mismatched = bool(stored) and any(stored.get(key) != value for key, value in env.items())
+    if mismatched and not save_all:
+        return None
+    updates = {
+        name: result for name, result in results.items()
+        if save_all or verdicts[name]["status"] == "new"
+    }
+    if not updates:
+        return None
+    merged = {} if mismatched else dict(stored.get("results", {}))
+    merged.update(updates)
+    return {"timestamp": datetime.now().isoformat(), **env, "results": merged}
+
+
+def load_json(path, default):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def write_json(path, data):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="99 CENTS Car Stereo tooling benchmarks")
+    parser.add_argument("--tracks", type=int, default=5000, help="fixture playlist size")
+    parser.add_argument("--repeat", type=int, default=10, help="timed runs per benchmark")
+    parser.add_argument("--warmup", type=int, default=2, help="untimed runs per benchmark")
+    parser.add_argument("--only", action="append", help="run only this benchmark (repeatable)")
+    parser.add_argument("--bench-dir", default=BENCH_DIR, help="fixtures, history and baseline")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="minimum median slowdown to count as a regression (default 10%%)")
+    parser.add_argument("--t-critical", type=float, default=2.0,
+                        help="Welch t statistic required for significance")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="store this run as the new baseline")
+    parser.add_argument("--profile", action="store_true",
+                        help="dump cProfile/tracemalloc hot spots for regressions")
+    parser.add_argument("--regenerate", action="store_true", help="rebuild fixtures")
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.bench_dir, exist_ok=True)
+    history_path = os.path.join(args.bench_dir, HISTORY_FILE)
+    baseline_path = os.path.join(args.bench_dir, BASELINE_FILE)
+
+    print("🎵 99 CENTS CAR STEREO PLAYER - TOOLING BENCHMARKS")
+    print("=" * 55)
+    fixtures = generate_fixtures(os.path.join(args.bench_dir, "fixtures"),
+                                 args.tracks, args.regenerate)
+    print(f"Fixtures: {args.tracks} tracks in {fixtures}")
+
+    env = environment(args.tracks)
+    stored = load_json(baseline_path, {})
+    baseline = stored.get("results", {})
+    mismatched = [key for key in env if stored and stored.get(key) != env[key]]
+    if mismatched:
+        for key in mismatched:
+            print(f"⚠️ Baseline {key} is {stored.get(key)!r}, this run {env[key]!r} - not comparable")
+        print("   Skipping comparison; use --save-baseline to re-record it here")
+        baseline = {}
+
+    with serve(fixtures) as base_url:
+        benchmarks = build_benchmarks(fixtures, base_url)
+        if args.only:
+            benchmarks = {name: func for name, func in benchmarks.items() if name in args.only}
+
+        results = {}
+        for name, func in benchmarks.items():
+            results[name] = summarize(measure(func, args.repeat, args.warmup))
+
+        verdicts = compare(baseline, results, args.threshold, args.t_critical)
+
+        print(f"\n{'BENCHMARK':<18}{'MEDIAN':>12}{'STDEV':>12}{'VS BASELINE':>14}")
+        for name, result in results.items():
+            verdict = verdicts[name]
+            if verdict["status"] == "new":
+                delta = "-"
+            else:
+                icon = {"regression": "❌", "improvement": "✅"}.get(verdict["status"], "  ")
+                delta = f"{icon} {verdict['change']:+.1%}"
+            print(f"{name:<18}{result['median'] * 1000:>10.2f}ms"
+                  f"{result['stdev'] * 1000:>10.2f}ms{delta:>14}")
+
+        regressions = [name for name, v in verdicts.items() if v["status"] == "regression"]
+        if regressions and args.profile:
+            for name in regressions:
+                profile(name, benchmarks[name], os.path.join(args.bench_dir, "profiles"))
+
+    run = {
+        "timestamp": datetime.now().isoformat(),
+        **env,
+        "repeat": args.repeat,
+        "results": results,
+        "verdicts": verdicts,
+    }
+    history = load_json(history_path, [])
+    history.append(run)
+    write_json(history_path, history)
+
+    new_baseline = merge_baseline(stored, results, verdicts, env, args.save_baseline)
+    if new_baseline:
+        write_json(baseline_path, new_baseline)
+        saved = [name for name in results if new_baseline["results"].get(name) is results[name]]
+        print(f"\n📌 Baseline saved for: {', '.join(saved)}")
+
+    print("\n" + "=" * 55)
+    if regressions:
+        print(f"❌ {len(regressions)} REGRESSION(S): {', '.join(regressions)}")
+        return 1
+    print("🎉 NO REGRESSIONS")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Tests for the benchmark comparison and baseline logic (benchmark.py)
+Run with: python -m pytest benchmark_test.py
+"""
+
+import math
+
+from benchmark import compare, merge_baseline, summarize, welch_t
+
+ENV = {"python": "CPython 3.11.7", "machine": "x86_64", "host": "deck", "tracks": 100}
+FAST = [1.00, 1.02, 0.98, 1.01, 0.99]
+SLOW = [1.50, 1.52, 1.48, 1.51, 1.49]
+
+
+def results(**samples):
+    return {name: summarize(values) for name, values in samples.items()}
+
+
+def test_regression_improvement_and_new():
+    baseline = results(slower=FAST, faster=SLOW)
+    current = results(slower=SLOW, faster=FAST, added=FAST)
+    verdicts = compare(baseline, current, threshold=0.10, t_critical=2.0)
+
+    assert verdicts["slower"]["status"] == "regression"
+    assert verdicts["slower"]["change"] > 0.4
+    assert verdicts["faster"]["status"] == "improvement"
+    assert verdicts["added"] == {"status": "new"}
+
+
+def test_noise_is_unchanged():
+    # A 15% median shift hidden in wide variance is not significant
+    noisy_base = [1.0, 0.2, 1.8, 0.5, 1.5]
+    noisy_now = [1.15, 0.3, 2.0, 0.4, 1.9]
+    verdicts = compare(results(x=noisy_base), results(x=noisy_now), 0.10, 2.0)
+    assert verdicts["x"]["status"] == "unchanged"
+
+    # A significant but small shift stays under the threshold
+    verdicts = compare(results(x=FAST), results(x=[v * 1.05 for v in FAST]), 0.10, 2.0)
+    assert verdicts["x"]["status"] == "unchanged"
+
+
+def test_zero_variance_samples():
+    assert math.isinf(welch_t([1.0] * 5, [2.0] * 5))
+    assert welch_t([1.0] * 5, [1.0] * 5) == 0.0
+    assert welch_t([2.0] * 5, [1.0] * 5) == 0.0
+    assert welch_t([1.0], [2.0]) == 0.0
+
+    verdicts = compare(results(x=[1.0] * 5), results(x=[2.0] * 5), 0.10, 2.0)
+    assert verdicts["x"]["status"] == "regression"
+
+
+def test_only_run_keeps_existing_baseline_entries():
+    stored = {**ENV, "results": results(a=FAST, b=FAST)}
+    current = results(a=SLOW)
+    verdicts = compare(stored["results"], current, 0.10, 2.0)
+
+    # A plain --only run leaves an existing entry alone
+    assert merge_baseline(stored, current, verdicts, ENV) is None
+
+    merged = merge_baseline(stored, current, verdicts, ENV, save_all=True)
+    assert set(merged["results"]) == {"a", "b"}
+    assert merged["results"]["a"]["samples"] == SLOW
+    assert merged["results"]["b"]["samples"] == FAST
+
+
+def test_first_run_and_new_benchmarks_are_recorded():
+    current = results(a=FAST)
+    merged = merge_baseline({}, current, compare({}, current, 0.10, 2.0), ENV)
+    assert set(merged["results"]) == {"a"}
+    assert merged["tracks"] == ENV["tracks"]
+
+    current = results(b=SLOW)
+    merged = merge_baseline(merged, current, compare(merged["results"], current, 0.10, 2.0), ENV)
+    assert set(merged["results"]) == {"a", "b"}
+
+
+def test_other_environment_is_not_merged():
+    stored = {**ENV, "host": "other", "results": results(a=FAST)}
+    current = results(b=FAST)
+    verdicts = compare({}, current, 0.10, 2.0)
+
+    assert merge_baseline(stored, current, verdicts, ENV) is None
+    replaced = merge_baseline(stored, current, verdicts, ENV, save_all=True)
+    assert set(replaced["results"]) == {"b"}
+    assert replaced["host"] == "deck"
@@ -1,251 +1,304 @@
 #!/usr/bin/env python3
 """
 Comprehensive Test Report for 99 CENTS Car Stereo Player
+Incremental deployment audit: scans the site root, hashes only files that
+changed since the previous run and reports added, changed and broken assets.
 """
 
-import requests
+import argparse
+import hashlib
+import json
 import os
+import re
 import sys
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime
 
-def generate_test_report():
-    print("🎵 99 CENTS CAR STEREO PLAYER - COMPREHENSIVE TEST REPORT")
-    print("=" * 65)
-    print(f"Test Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    print(f"Application URL: http://localhost:8080")
-    print()
+DEFAULT_ROOT = os.path.dirname(os.path.abspath(__file__))
+STATE_DIR = ".deploy"
+SNAPSHOT_FILE = "snapshot.json"
+HASH_CACHE_FILE = "hash_cache.json"
+REPORT_FILE = "report.json"
+SKIP_DIRS = {"__pycache__", "node_modules"}
+HASH_CHUNK = 1024 * 1024
+STAT_BATCH = 256
+
+# Relative asset paths referenced from the page, e.g. "./audio/track1.mp3"
+ASSET_REF_PATTERN = re.compile(r'["\'](\./[^"\'\s]+)["\']')
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
 
-    # Test 1: Application Accessibility
-    print("1. APPLICATION ACCESSIBILITY")
-    print("-" * 30)
+
+def list_dir(path, prefix):
+    """List one directory without stat-ing files: ([(relpath, entry)], [(subdir, prefix)])"""
+    files = []
+    subdirs = []
     try:
-        response = requests.get("http://localhost:8080", timeout=10)
-        if response.status_code == 200:
-            print("✅ Application loads successfully")
-            print(f"   Status Code: {response.status_code}")
-            print(f"   Content Size: {len(response.text)} bytes")
-            print(f"   Content Type: {response.headers.get('content-type', 'Unknown')}")
-        else:
-            print(f"❌ Application failed to load (Status: {response.status_code})")
-            return False
-    except Exception as e:
-        print(f"❌ Application not accessible: {str(e)}")
-        return False
-
-    # Test 2: File Structure
-    print("\n2. FILE STRUCTURE")
-    print("-" * 20)
-    
-    required_files = [
-        ("/app/index.html", "Main application file"),
-        ("/app/assets/alpine_faceplate.png", "Alpine faceplate image"),
-        ("/app/audio/track1.mp3", "Audio track 1"),
-        ("/app/audio/track2.mp3", "Audio track 2"),
-        ("/app/audio/track3.mp3", "Audio track 3"),
-    ]
-    
-    for file_path, description in required_files:
-        if os.path.exists(file_path):
-            size = os.path.getsize(file_path)
-            print(f"✅ {description}: {size} bytes")
-        else:
-            print(f"❌ {description}: Missing")
-
-    # Test 3: HTML Structure Analysis
-    print("\n3. HTML STRUCTURE ANALYSIS")
-    print("-" * 30)
-    
-    content = response.text
-    
-    # Essential HTML elements
-    html_elements = [
-        ('<!doctype html>', "HTML5 doctype"),
-        ('<title>99 CENTS Car Stereo Player</title>', "Page title"),
-        ('class="deck"', "Main deck container"),
-        ('id="playBtn"', "Play/Pause button"),
-        ('id="nextBtn"', "Next track button"),
-        ('id="vol"', "Volume slider"),
-        ('id="ticker"', "Scrolling ticker"),
-        ('id="status"', "Status display"),
-        ('<audio id="player"', "HTML5 audio element"),
-    ]
-    
-    for element, description in html_elements:
-        if element in content:
-            print(f"✅ {description}")
+        entries = os.scandir(path)
+    except OSError:
+        return files, subdirs
+    with entries:
+        for entry in entries:
+            # Hidden entries (.git, .deploy, ...) are never deployed
+            if entry.name.startswith("."):
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name not in SKIP_DIRS:
+                    subdirs.append((entry.path, prefix + entry.name + "/"))
+            elif entry.is_file(follow_symlinks=False):
+                files.append((prefix + entry.name, entry))
+    return files, subdirs
+
+
+def stat_batch(batch):
+    """Stat a batch of scandir entries: {relpath: (size, mtime_ns)}"""
+    stats = {}
+    for rel, entry in batch:
+        try:
+            st = entry.stat(follow_symlinks=False)
+        except OSError:
+            continue
+        stats[rel] = (st.st_size, st.st_mtime_ns)
+    return stats
+
+
+def scan_tree(root, workers=None):
+    """Walk root with os.scandir and return {relpath: (size, mtime_ns)}
+
+    Directories are listed and file entries stat-ed on a thread pool, in
+    batches of STAT_BATCH, so a large flat audio/ is spread across workers.
+    """
+    files = {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        listings = {pool.submit(list_dir, root, "")}
+        stats = []
+        while listings:
+            done, listings = wait(listings, return_when=FIRST_COMPLETED)
+            for future in done:
+                found, subdirs = future.result()
+                for i in range(0, len(found), STAT_BATCH):
+                    stats.append(pool.submit(stat_batch, found[i:i + STAT_BATCH]))
+                for path, prefix in subdirs:
+                    listings.add(pool.submit(list_dir, path, prefix))
+        for future in stats:
+            files.update(future.result())
+    return files
+
+
+def referenced_assets(root, page="index.html"):
+    """Return the set of local asset paths referenced from the page"""
+    try:
+        with open(os.path.join(root, page), encoding="utf-8") as f:
+            content = f.read()
+    except OSError:
+        return {page}
+    refs = {page}
+    for match in ASSET_REF_PATTERN.finditer(content):
+        path = match.group(1)[2:].split("?", 1)[0].split("#", 1)[0]
+        if path:
+            refs.add(path)
+    return refs
+
+
+def check_content(path, head, size):
+    """Classify a file from its first bytes: (status, reason)"""
+    if size == 0:
+        return "broken", "empty file"
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".mp3":
+        if b"Placeholder" in head[:64]:
+            return "placeholder", "placeholder MP3"
+        # ID3v2 tag or a bare MPEG audio frame sync
+        if head[:3] == b"ID3" or (len(head) > 1 and head[0] == 0xFF and head[1] & 0xE0 == 0xE0):
+            return "ok", None
+        return "broken", "not an MP3 stream"
+    if ext == ".png":
+        if head.startswith(PNG_SIGNATURE):
+            return "ok", None
+        return "broken", "bad PNG signature"
+    return "ok", None
+
+
+def inspect_file(root, path, size):
+    """Hash a file and check its content, reading it once"""
+    digest = hashlib.sha256()
+    head = b""
+    try:
+        with open(os.path.join(root, path), "rb") as f:
+            chunk = f.read(HASH_CHUNK)
+            head = chunk[:64]
+            while chunk:
+                digest.update(chunk)
+                chunk = f.read(HASH_CHUNK)
+    except OSError as e:
+        return {"size": size, "sha256": None, "status": "broken", "reason": str(e)}
+    status, reason = check_content(path, head, size)
+    return {"size": size, "sha256": digest.hexdigest(), "status": status, "reason": reason}
+
+
+def load_snapshot(snapshot_path):
+    try:
+        with open(snapshot_path, encoding="utf-8") as f:
+            return json.load(f).get("files", {})
+    except (OSError, ValueError):
+        return {}
+
+
+def save_snapshot(snapshot_path, files):
+    os.makedirs(os.path.dirname(snapshot_path), exist_ok=True)
+    tmp_path = snapshot_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"generated_at": datetime.now().isoformat(), "files": files}, f)
+    os.replace(tmp_path, snapshot_path)
+
+
+def build_snapshot(root, hash_cache, workers=None):
+    """Return (files, hashed_count); unchanged files reuse hash_cache results"""
+    listing = scan_tree(root, workers)
+    files = {}
+    pending = []
+    for path, (size, mtime_ns) in listing.items():
+        prev = hash_cache.get(path)
+        if prev and prev.get("size") == size and prev.get("mtime_ns") == mtime_ns:
+            files[path] = prev
         else:
-            print(f"❌ {description}")
-
-    # Test 4: CSS Styling Analysis
-    print("\n4. CSS STYLING ANALYSIS")
-    print("-" * 25)
-    
-    css_features = [
-        (':root {', "CSS custom properties"),
-        ('--w: 700px; --h: 218px;', "Deck dimensions (700x218px)"),
-        ('alpine_faceplate.png', "Background image reference"),
-        ('.btn', "Button styling"),
-        ('.slider', "Slider styling"),
-        ('.ticker', "Ticker styling"),
-        ('@keyframes scroll', "Scrolling animation"),
-        ('@media', "Responsive design"),
-        ('.debug', "Debug mode styling"),
+            pending.append((path, size, mtime_ns))
+
+    if pending:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = pool.map(lambda item: inspect_file(root, item[0], item[1]), pending)
+            for (path, _, mtime_ns), result in zip(pending, results):
+                result["mtime_ns"] = mtime_ns
+                files[path] = result
+
+    for path in referenced_assets(root) - files.keys():
+        files[path] = {"size": None, "mtime_ns": None, "sha256": None,
+                       "status": "missing", "reason": "referenced by index.html"}
+    return files, len(pending)
+
+
+def diff_snapshots(previous, current):
+    """Compare two snapshots and list added/changed/removed/broken/regressions"""
+    present = {path for path, info in current.items() if info["status"] != "missing"}
+    was_present = {path for path, info in previous.items() if info["status"] != "missing"}
+
+    added = sorted(present - was_present)
+    removed = sorted(was_present - present)
+    changed = sorted(
+        path for path in present & was_present
+        if current[path]["sha256"] != previous[path]["sha256"]
+    )
+    broken = [
+        {"path": path, "status": info["status"], "reason": info["reason"]}
+        for path, info in sorted(current.items())
+        if info["status"] in ("broken", "missing")
     ]
-    
-    for feature, description in css_features:
-        if feature in content:
-            print(f"✅ {description}")
-        else:
-            print(f"❌ {description}")
-
-    # Test 5: JavaScript Functionality Analysis
-    print("\n5. JAVASCRIPT FUNCTIONALITY ANALYSIS")
-    print("-" * 40)
-    
-    js_features = [
-        ('tracks = [', "Track playlist configuration"),
-        ('playPause()', "Play/Pause functionality"),
-        ('nextTrack()', "Next track functionality"),
-        ('updateVolume()', "Volume control"),
-        ('setTrack()', "Track switching"),
-        ('addEventListener("click"', "Click event handlers"),
-        ('addEventListener("keydown"', "Keyboard event handlers"),
-        ('case "Space":', "SPACE key handler"),
-        ('case "ArrowRight":', "RIGHT ARROW key handler"),
-        ('case "ArrowUp":', "UP ARROW key handler"),
-        ('case "ArrowDown":', "DOWN ARROW key handler"),
-        ('case "KeyD":', "Debug mode toggle"),
-        ('audio.addEventListener("ended"', "Track end handling"),
-        ('audio.addEventListener("error"', "Error handling"),
+    regressions = [
+        item for item in broken
+        if previous.get(item["path"], {}).get("status") not in ("broken", "missing")
     ]
-    
-    for feature, description in js_features:
-        if feature in content:
-            print(f"✅ {description}")
-        else:
-            print(f"❌ {description}")
-
-    # Test 6: Control Positioning Analysis
-    print("\n6. CONTROL POSITIONING ANALYSIS")
-    print("-" * 35)
-    
-    import re
-    
-    # Extract button positions
-    play_pos = re.search(r'\.btn\.play\s*{\s*left:\s*(\d+)px;\s*top:\s*(\d+)px;', content)
-    next_pos = re.search(r'\.btn\.next\s*{\s*left:\s*(\d+)px;\s*top:\s*(\d+)px;', content)
-    vol_pos = re.search(r'\.slider\.volume\s*{\s*left:\s*(\d+)px;\s*top:\s*(\d+)px;', content)
-    ticker_pos = re.search(r'\.ticker-wrap\s*{\s*[^}]*left:\s*(\d+)px;\s*top:\s*(\d+)px;', content)
-    
-    if play_pos:
-        print(f"✅ Play button positioned at: left:{play_pos.group(1)}px, top:{play_pos.group(2)}px")
-    else:
-        print("❌ Play button position not found")
-    
-    if next_pos:
-        print(f"✅ Next button positioned at: left:{next_pos.group(1)}px, top:{next_pos.group(2)}px")
-    else:
-        print("❌ Next button position not found")
-    
-    if vol_pos:
-        print(f"✅ Volume slider positioned at: left:{vol_pos.group(1)}px, top:{vol_pos.group(2)}px")
-    else:
-        print("❌ Volume slider position not found")
-    
-    if ticker_pos:
-        print(f"✅ Ticker display positioned at: left:{ticker_pos.group(1)}px, top:{ticker_pos.group(2)}px")
+    return {
+        "added": added,
+        "changed": changed,
+        "removed": removed,
+        "broken": broken,
+        "regressions": regressions,
+    }
+
+
+def generate_test_report(root=DEFAULT_ROOT, state_dir=None, workers=None, save=True):
+    """Scan root, diff against the last good snapshot and return the report dict
+
+    Two files are kept in state_dir: the hash cache, refreshed on every run so
+    only modified files are re-hashed, and the last snapshot without
+    regressions, which is the baseline the diff is taken against.
+    """
+    root = os.path.abspath(root)
+    state_dir = state_dir or os.path.join(root, STATE_DIR)
+    snapshot_path = os.path.join(state_dir, SNAPSHOT_FILE)
+    hash_cache_path = os.path.join(state_dir, HASH_CACHE_FILE)
+
+    previous = load_snapshot(snapshot_path)
+    hash_cache = load_snapshot(hash_cache_path) or previous
+    current, hashed = build_snapshot(root, hash_cache, workers)
+    diff = diff_snapshots(previous, current)
+
+    placeholders = sorted(p for p, info in current.items() if info["status"] == "placeholder")
+    report = {
+        "generated_at": datetime.now().isoformat(),
+        "root": root,
+        "baseline": bool(previous),
+        "summary": {
+            "files": sum(1 for info in current.values() if info["status"] != "missing"),
+            "bytes": sum(info["size"] or 0 for info in current.values()),
+            "hashed": hashed,
+            "placeholders": len(placeholders),
+            **{key: len(value) for key, value in diff.items()},
+        },
+        "placeholders": placeholders,
+        **diff,
+    }
+
+    if save:
+        save_snapshot(hash_cache_path, current)
+        # Keep the last good snapshot as the baseline until regressions are fixed
+        if not diff["regressions"]:
+            save_snapshot(snapshot_path, current)
+        with open(os.path.join(state_dir, REPORT_FILE), "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return report
+
+
+def print_report(report):
+    summary = report["summary"]
+    print("🎵 99 CENTS CAR STEREO PLAYER - DEPLOYMENT REPORT")
+    print("=" * 65)
+    print(f"Report Date: {report['generated_at']}")
+    print(f"Root: {report['root']}")
+    if not report["baseline"]:
+        print("⚠️ No previous snapshot - this run becomes the baseline")
+    print(f"Files: {summary['files']} ({summary['bytes']} bytes), "
+          f"re-hashed: {summary['hashed']}")
+    print()
+
+    for key, label in (("added", "ADDED"), ("changed", "CHANGED"), ("removed", "REMOVED")):
+        print(f"{label}: {len(report[key])}")
+        for path in report[key]:
+            print(f"   {path}")
+
+    print(f"BROKEN: {len(report['broken'])}")
+    for item in report["broken"]:
+        print(f"❌ {item['path']}: {item['status']} ({item['reason']})")
+
+    if report["placeholders"]:
+        print(f"⚠️ {len(report['placeholders'])} placeholder MP3(s) - replace before release")
+
+    print("\n" + "=" * 65)
+    if report["regressions"]:
+        print(f"❌ {len(report['regressions'])} REGRESSION(S) SINCE LAST DEPLOY")
+        for item in report["regressions"]:
+            print(f"   {item['path']}: {item['reason']}")
     else:
-        print("❌ Ticker display position not found")
-
-    # Test 7: Audio Configuration Analysis
-    print("\n7. AUDIO CONFIGURATION ANALYSIS")
-    print("-" * 35)
-    
-    # Extract track information
-    tracks_match = re.search(r'tracks = \[(.*?)\];', content, re.DOTALL)
-    if tracks_match:
-        tracks_content = tracks_match.group(1)
-        track_count = tracks_content.count('url:')
-        print(f"✅ Found {track_count} tracks configured")
-        
-        # Check individual tracks
-        for i in range(1, 4):
-            track_file = f"track{i}.mp3"
-            if track_file in tracks_content:
-                print(f"✅ {track_file} configured in playlist")
-            else:
-                print(f"❌ {track_file} not found in playlist")
+        print("🎉 NO REGRESSIONS - READY FOR DEPLOYMENT")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="99 CENTS Car Stereo deployment report")
+    parser.add_argument("--root", default=DEFAULT_ROOT, help="site root to audit")
+    parser.add_argument("--state-dir", help=f"snapshot/report directory (default: ROOT/{STATE_DIR})")
+    parser.add_argument("--workers", type=int, help="parallel scan/hash threads")
+    parser.add_argument("--json", action="store_true", help="print the JSON report to stdout")
+    parser.add_argument("--no-save", action="store_true", help="do not update the snapshot")
+    args = parser.parse_args(argv)
+
+    report = generate_test_report(args.root, args.state_dir, args.workers, save=not args.no_save)
+    if args.json:
+        json.dump(report, sys.stdout, indent=2)
+        print()
     else:
-        print("❌ Track configuration not found")
-
-    # Test 8: Error Handling Analysis
-    print("\n8. ERROR HANDLING ANALYSIS")
-    print("-" * 30)
-    
-    error_features = [
-        ('audio.addEventListener("error"', "Audio error listener"),
-        ('updateStatus("ERROR")', "Error status display"),
-        ('Audio file not found', "Error message text"),
-        ('console.error', "Console error logging"),
-        ('.error', "Error styling class"),
-    ]
-    
-    for feature, description in error_features:
-        if feature in content:
-            print(f"✅ {description}")
-        else:
-            print(f"❌ {description}")
-
-    # Test 9: Placeholder Audio Files
-    print("\n9. PLACEHOLDER AUDIO FILES")
-    print("-" * 30)
-    
-    for i in range(1, 4):
-        audio_file = f"/app/audio/track{i}.mp3"
-        try:
-            with open(audio_file, 'r') as f:
-                content_preview = f.read(50)
-                if "Placeholder" in content_preview:
-                    print(f"✅ track{i}.mp3 is placeholder (as expected)")
-                else:
-                    print(f"⚠️ track{i}.mp3 may contain actual audio")
-        except Exception as e:
-            print(f"❌ track{i}.mp3 read error: {str(e)}")
-
-    # Final Assessment
-    print("\n" + "=" * 65)
-    print("FINAL ASSESSMENT")
-    print("=" * 65)
-    
-    print("✅ PASSED - Application Structure: Complete HTML/CSS/JS implementation")
-    print("✅ PASSED - Visual Design: Alpine faceplate with proper dimensions")
-    print("✅ PASSED - Interactive Controls: Play, Next, Volume controls implemented")
-    print("✅ PASSED - Display Features: Scrolling ticker and status display")
-    print("✅ PASSED - Keyboard Shortcuts: All shortcuts (SPACE, arrows, D) implemented")
-    print("✅ PASSED - Debug Mode: Toggle functionality with visual indicators")
-    print("✅ PASSED - Audio System: HTML5 audio with playlist and error handling")
-    print("✅ PASSED - Responsive Design: Scaling for different screen sizes")
-    print("✅ PASSED - Error Handling: Graceful handling of placeholder audio files")
-    print("✅ PASSED - File Serving: All assets accessible via HTTP server")
-    
-    print("\n📋 MANUAL TESTING RECOMMENDATIONS:")
-    print("1. Open http://localhost:8080 in Chrome/Edge browser")
-    print("2. Verify Alpine faceplate displays correctly")
-    print("3. Test Play/Pause button (expect audio error - normal)")
-    print("4. Test Next track button")
-    print("5. Test volume slider")
-    print("6. Test keyboard shortcuts: SPACE, RIGHT ARROW, UP/DOWN ARROW")
-    print("7. Press 'D' to toggle debug mode and verify hitbox alignment")
-    print("8. Test responsive design by resizing browser window")
-    print("9. Check console for expected audio loading errors")
-    print("10. Replace placeholder MP3s with real audio files for full functionality")
-    
-    print("\n🎉 OVERALL STATUS: READY FOR DEPLOYMENT")
-    print("The 99 CENTS Car Stereo Player is fully implemented and functional.")
-    print("All core features are working. Only placeholder audio files need replacement.")
-    
-    return True
+        print_report(report)
+    return 1 if report["regressions"] else 0
+
 
 if __name__ == "__main__":
-    success = generate_test_report()
-    sys.exit(0 if success else 1)
\ No newline at end of file
+    sys.exit(main())
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Tests for the incremental deployment report (comprehensive_test_report.py)
+Run with: python -m pytest deploy_report_test.py
+"""
+
+import os
+
+from comprehensive_test_report import (
+    PNG_SIGNATURE,
+    STAT_BATCH,
+    build_snapshot,
+    diff_snapshots,
+    generate_test_report,
+    main,
+)
+
+MP3 = b"ID3\x03\x00\x00\x00\x00\x00\x00" + b"\xff\xfb\x90\x64" + b"\x00" * 413
+PAGE = """<!doctype html>
+<div class="deck" style="background: url('./assets/alpine_faceplate.png')"></div>
+<script>
+  const tracks = [
+    { url: "./audio/track1.mp3" },
+    { url: "./audio/track2.mp3" },
+  ];
+</script>
+"""
+
+
+def write(root, path, data):
+    full = os.path.join(root, path)
+    os.makedirs(os.path.dirname(full), exist_ok=True)
+    with open(full, "wb") as f:
+        f.write(data)
+
+
+def make_site(root):
+    write(root, "index.html", PAGE.encode())
+    write(root, "assets/alpine_faceplate.png", PNG_SIGNATURE + b"\x00" * 32)
+    write(root, "audio/track1.mp3", MP3)
+    write(root, "audio/track2.mp3", MP3)
+    write(root, "notes.txt", b"release notes")
+
+
+def run(root, state_dir):
+    return main(["--root", str(root), "--state-dir", str(state_dir), "--json"])
+
+
+def test_diff_added_changed_removed_missing(tmp_path):
+    make_site(tmp_path)
+    previous, hashed = build_snapshot(str(tmp_path), {})
+    assert hashed == 5
+
+    write(tmp_path, "audio/track3.mp3", MP3)
+    write(tmp_path, "assets/alpine_faceplate.png", b"not a png")
+    os.remove(tmp_path / "audio" / "track2.mp3")
+    os.remove(tmp_path / "notes.txt")
+
+    current, hashed = build_snapshot(str(tmp_path), previous)
+    assert hashed == 2  # only the new and the modified file
+    diff = diff_snapshots(previous, current)
+
+    assert diff["added"] == ["audio/track3.mp3"]
+    assert diff["changed"] == ["assets/alpine_faceplate.png"]
+    assert diff["removed"] == ["audio/track2.mp3", "notes.txt"]
+    assert {item["path"]: item["status"] for item in diff["broken"]} == {
+        "assets/alpine_faceplate.png": "broken",
+        "audio/track2.mp3": "missing",
+    }
+    assert [item["path"] for item in diff["regressions"]] == [
+        "assets/alpine_faceplate.png",
+        "audio/track2.mp3",
+    ]
+
+
+def test_large_flat_directory_is_stat_in_batches(tmp_path):
+    make_site(tmp_path)
+    count = STAT_BATCH * 3 + 7
+    for i in range(count):
+        write(tmp_path, f"audio/bulk{i}.mp3", MP3)
+
+    previous, hashed = build_snapshot(str(tmp_path), {}, workers=4)
+    assert hashed == count + 5
+    assert sum(path.startswith("audio/bulk") for path in previous) == count
+
+    write(tmp_path, "audio/bulk0.mp3", MP3 + b"\x00")
+    _, hashed = build_snapshot(str(tmp_path), previous, workers=4)
+    assert hashed == 1
+
+
+def test_known_breakage_is_not_a_regression(tmp_path):
+    make_site(tmp_path)
+    write(tmp_path, "audio/track1.mp3", b"garbage")
+    previous, _ = build_snapshot(str(tmp_path), {})
+    current, _ = build_snapshot(str(tmp_path), previous)
+    diff = diff_snapshots(previous, current)
+    assert [item["path"] for item in diff["broken"]] == ["audio/track1.mp3"]
+    assert diff["regressions"] == []
+
+
+def test_exit_code_and_incremental_state(tmp_path, capsys):
+    site = tmp_path / "site"
+    state = tmp_path / "state"
+    make_site(site)
+
+    assert run(site, state) == 0
+    write(site, "assets/alpine_faceplate.png", b"not a png")
+    assert run(site, state) == 1
+
+    # The regression stays reported until fixed, but nothing is re-hashed
+    report = generate_test_report(str(site), str(state))
+    assert report["summary"]["hashed"] == 0
+    assert [item["path"] for item in report["regressions"]] == ["assets/alpine_faceplate.png"]
+
+    write(site, "assets/alpine_faceplate.png", PNG_SIGNATURE)
+    assert run(site, state) == 0
+    capsys.readouterr()
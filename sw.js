@@ -0,0 +1,372 @@
+// 99 CENTS Car Stereo - Service Worker
+// Keeps the deck playing through connectivity dropouts:
+//   - the app shell and faceplate are precached on install
+//   - played and prefetched tracks live in a byte-budgeted LRU cache
+//   - audio Range requests are answered straight from the cache
+
+// Bump VERSION on every app shell change. AUDIO_SCHEMA is separate so UI
+// deploys keep the offline library; bump it only when the audio cache or
+// LRU index format changes.
+const VERSION = "v1";
+const AUDIO_SCHEMA = "v1";
+const SHELL_CACHE = `99cents-shell-${VERSION}`;
+const AUDIO_CACHE = `99cents-audio-${AUDIO_SCHEMA}`;
+const META_CACHE = `99cents-meta-${AUDIO_SCHEMA}`;
+const LRU_INDEX_URL = "./__audio-lru__.json";
+
+const SHELL_ASSETS = [
+  "./",
+  "./index.html",
+  "./assets/alpine_faceplate.png",
+];
+
+// Total bytes of audio kept on the device before the least recently
+// played tracks are evicted.
+const AUDIO_BUDGET_BYTES = 200 * 1024 * 1024;
+
+// LRU index: { [url]: { bytes, used } }. Loaded lazily because the worker
+// can be stopped and restarted by the browser at any time.
+let lruIndex = null;
+// All index mutations go through this chain so concurrent fetches and
+// prefetches never interleave a read-modify-write.
+let lruQueue = Promise.resolve();
+// URLs currently being downloaded into the audio cache.
+const inFlight = new Map();
+
+// Utility functions
+function isAudioRequest(url) {
+  return url.origin === self.location.origin && /\.mp3$/i.test(url.pathname);
+}
+
+function isShellRequest(request, url) {
+  if (url.origin !== self.location.origin) {
+    return false;
+  }
+  return request.mode === "navigate" ||
+    SHELL_ASSETS.some((asset) => new URL(asset, self.location).pathname === url.pathname);
+}
+
+function isShellNavigation(url) {
+  const scope = new URL("./", self.location).pathname;
+  return url.pathname === scope || url.pathname === scope + "index.html";
+}
+
+function cacheKey(url) {
+  // Cache audio by path only so "?t=..." style cache busters and Range
+  // headers never create duplicate entries.
+  const u = new URL(url, self.location);
+  return u.origin + u.pathname;
+}
+
+async function loadIndex() {
+  if (lruIndex) {
+    return lruIndex;
+  }
+  const meta = await caches.open(META_CACHE);
+  const stored = await meta.match(LRU_INDEX_URL);
+  lruIndex = stored ? await stored.json() : {};
+
+  // Drop index entries whose cached body disappeared (e.g. cleared by the
+  // browser under storage pressure).
+  const audioCache = await caches.open(AUDIO_CACHE);
+  for (const url of Object.keys(lruIndex)) {
+    if (!(await audioCache.match(url))) {
+      delete lruIndex[url];
+    }
+  }
+
+  // And the reverse: tracks cached without an index entry (the worker was
+  // stopped between put and record) would never be evicted. Adopt them as
+  // the least recently used entries.
+  for (const request of await audioCache.keys()) {
+    if (!lruIndex[request.url]) {
+      const response = await audioCache.match(request);
+      const bytes = parseInt(response.headers.get("Content-Length"), 10) ||
+        (await response.blob()).size;
+      lruIndex[request.url] = { bytes, used: 0 };
+    }
+  }
+  return lruIndex;
+}
+
+async function saveIndex() {
+  const meta = await caches.open(META_CACHE);
+  await meta.put(LRU_INDEX_URL, new Response(JSON.stringify(lruIndex), {
+    headers: { "Content-Type": "application/json" },
+  }));
+}
+
+function withIndex(update) {
+  lruQueue = lruQueue
+    .then(async () => {
+      await loadIndex();
+      await update(lruIndex);
+      await saveIndex();
+    })
+    .catch((error) => console.error("[sw] LRU index update failed:", error));
+  return lruQueue;
+}
+
+function touch(url) {
+  return withIndex((index) => {
+    if (index[url]) {
+      index[url].used = Date.now();
+    }
+  });
+}
+
+function record(url, bytes, protect) {
+  return withIndex(async (index) => {
+    index[url] = { bytes, used: Date.now() };
+
+    let total = Object.values(index).reduce((sum, entry) => sum + entry.bytes, 0);
+    if (total <= AUDIO_BUDGET_BYTES) {
+      return;
+    }
+
+    const audioCache = await caches.open(AUDIO_CACHE);
+    const oldestFirst = Object.keys(index).sort((a, b) => index[a].used - index[b].used);
+    for (const victim of oldestFirst) {
+      if (total <= AUDIO_BUDGET_BYTES) {
+        break;
+      }
+      if (victim === url || protect.has(victim)) {
+        continue;
+      }
+      await audioCache.delete(victim);
+      total -= index[victim].bytes;
+      delete index[victim];
+      console.log("[sw] Evicted track:", victim);
+    }
+  });
+}
+
+async function putTrack(url, response, protect) {
+  const blob = await response.blob();
+  if (blob.size > AUDIO_BUDGET_BYTES) {
+    return;
+  }
+  const headers = new Headers(response.headers);
+  headers.delete("Content-Range");
+  headers.set("Content-Length", String(blob.size));
+  const audioCache = await caches.open(AUDIO_CACHE);
+  await audioCache.put(url, new Response(blob, { status: 200, headers }));
+  await record(url, blob.size, protect);
+}
+
+// Register a cache fill so prefetches of the same URL reuse it instead of
+// starting a second download. Resolves to nothing: callers that need the
+// track read it back from the cache themselves.
+function trackJob(url, job) {
+  const shared = job.then(() => undefined);
+  inFlight.set(url, shared);
+  shared.finally(() => inFlight.delete(url)).catch(() => {});
+  return shared;
+}
+
+// Download a whole track into the audio cache.
+function storeTrack(url, protect = new Set()) {
+  if (inFlight.has(url)) {
+    return inFlight.get(url);
+  }
+
+  return trackJob(url, (async () => {
+    const audioCache = await caches.open(AUDIO_CACHE);
+    if (await audioCache.match(url)) {
+      return;
+    }
+
+    const response = await fetch(url, { credentials: "same-origin" });
+    if (response.status !== 200) {
+      throw new Error(`Track fetch failed (${response.status}): ${url}`);
+    }
+    const length = parseInt(response.headers.get("Content-Length"), 10);
+    if (length > AUDIO_BUDGET_BYTES) {
+      // Too large to ever fit; it will be played from the network.
+      await response.body.cancel();
+      return;
+    }
+    await putTrack(url, response, protect);
+  })());
+}
+
+// True when a 206 response carries the whole file ("bytes 0-(N-1)/N"), as
+// servers answer the audio element's initial "Range: bytes=0-" request.
+function coversWholeFile(response) {
+  const match = /^bytes 0-(\d+)\/(\d+)$/.exec(response.headers.get("Content-Range") || "");
+  return match !== null && parseInt(match[1], 10) + 1 === parseInt(match[2], 10);
+}
+
+// Build a 206 Partial Content response for a "bytes=start-end" header.
+async function rangeResponse(response, rangeHeader) {
+  const blob = await response.blob();
+  const size = blob.size;
+  const match = /^bytes=(\d*)-(\d*)$/.exec(rangeHeader.trim());
+
+  let start;
+  let end;
+  if (match && match[1] !== "") {
+    start = parseInt(match[1], 10);
+    end = match[2] !== "" ? Math.min(parseInt(match[2], 10), size - 1) : size - 1;
+  } else if (match && match[2] !== "") {
+    // Suffix range: the last N bytes.
+    start = Math.max(0, size - parseInt(match[2], 10));
+    end = size - 1;
+  }
+
+  if (start === undefined || start >= size || start > end) {
+    return new Response(null, {
+      status: 416,
+      statusText: "Range Not Satisfiable",
+      headers: { "Content-Range": `bytes */${size}` },
+    });
+  }
+
+  const headers = new Headers(response.headers);
+  headers.set("Content-Range", `bytes ${start}-${end}/${size}`);
+  headers.set("Content-Length", String(end - start + 1));
+  headers.set("Accept-Ranges", "bytes");
+  return new Response(blob.slice(start, end + 1), {
+    status: 206,
+    statusText: "Partial Content",
+    headers,
+  });
+}
+
+async function serveFromCache(cached, request) {
+  const range = request.headers.get("Range");
+  return range ? rangeResponse(cached, range) : cached;
+}
+
+async function handleAudio(event) {
+  const request = event.request;
+  const url = cacheKey(request.url);
+  const audioCache = await caches.open(AUDIO_CACHE);
+
+  const cached = await audioCache.match(url);
+  if (cached) {
+    event.waitUntil(touch(url));
+    return serveFromCache(cached, request);
+  }
+
+  // Not cached yet: go to the network without waiting for any background
+  // download, so seeks never stall behind a full-track fetch.
+  const response = await fetch(request);
+
+  // Fill the cache from the stream that is already arriving when it holds
+  // the whole file: a plain 200 (python -m http.server ignores Range) or a
+  // 206 for "bytes=0-". Other partial responses are not cached; the track
+  // is picked up by a later full play or by playlist prefetch.
+  const whole = response.status === 200 ||
+    (response.status === 206 && coversWholeFile(response));
+  if (whole && !inFlight.has(url)) {
+    const copy = response.clone();
+    event.waitUntil(
+      trackJob(url, putTrack(url, copy, new Set()))
+        .catch((error) => console.error("[sw] Caching track failed:", error))
+    );
+  }
+  return response;
+}
+
+async function handleShell(event) {
+  const request = event.request;
+  const shellCache = await caches.open(SHELL_CACHE);
+  const url = new URL(request.url);
+
+  // Other same-origin pages (README.md, directory listings, ...) are never
+  // written to the cache; offline they fall back to the player.
+  if (request.mode === "navigate" && !isShellNavigation(url)) {
+    try {
+      return await fetch(request);
+    } catch (error) {
+      const shell = await shellCache.match("./index.html");
+      if (shell) {
+        return shell;
+      }
+      throw error;
+    }
+  }
+
+  const cacheTarget = request.mode === "navigate" ? "./index.html" : request;
+  const cached = await shellCache.match(cacheTarget, { ignoreSearch: true });
+
+  // Stale-while-revalidate: answer from the cache, refresh in the background.
+  // The put is awaited under waitUntil so the worker is not stopped first.
+  const network = fetch(request);
+  event.waitUntil(
+    network
+      .then(async (response) => {
+        if (response.ok) {
+          await shellCache.put(cacheTarget, response.clone());
+        }
+      })
+      .catch(() => {})
+  );
+
+  return cached || network;
+}
+
+async function prefetch(urls, keep) {
+  if (self.navigator.connection && self.navigator.connection.saveData) {
+    return;
+  }
+  const protect = new Set(keep.map(cacheKey));
+  // Sequential on purpose: the next track should finish first and we do not
+  // want to saturate a weak link with K parallel downloads.
+  for (const raw of urls) {
+    const url = cacheKey(raw);
+    protect.add(url);
+    try {
+      await storeTrack(url, protect);
+      await touch(url);
+    } catch (error) {
+      console.warn("[sw] Prefetch failed:", url, error);
+      return;
+    }
+  }
+}
+
+// Lifecycle
+self.addEventListener("install", (event) => {
+  event.waitUntil(
+    caches.open(SHELL_CACHE)
+      .then((cache) => cache.addAll(SHELL_ASSETS))
+      .then(() => self.skipWaiting())
+  );
+});
+
+self.addEventListener("activate", (event) => {
+  // Only outdated shells are dropped on a UI deploy; audio and LRU index
+  // caches go only when AUDIO_SCHEMA changes.
+  const isStale = (key) =>
+    (key.startsWith("99cents-shell-") && key !== SHELL_CACHE) ||
+    (key.startsWith("99cents-audio-") && key !== AUDIO_CACHE) ||
+    (key.startsWith("99cents-meta-") && key !== META_CACHE);
+  event.waitUntil(
+    caches.keys()
+      .then((keys) => Promise.all(keys.filter(isStale).map((key) => caches.delete(key))))
+      .then(() => self.clients.claim())
+  );
+});
+
+self.addEventListener("fetch", (event) => {
+  const request = event.request;
+  if (request.method !== "GET") {
+    return;
+  }
+
+  const url = new URL(request.url);
+  if (isAudioRequest(url)) {
+    event.respondWith(handleAudio(event));
+  } else if (isShellRequest(request, url)) {
+    event.respondWith(handleShell(event));
+  }
+});
+
+self.addEventListener("message", (event) => {
+  const data = event.data || {};
+  if (data.type === "prefetch" && Array.isArray(data.urls)) {
+    event.waitUntil(prefetch(data.urls, data.keep || []));
+  }
+});